@@ -6,9 +6,51 @@ that processes user inputs and displays responses.
 """
 import sys
 import asyncio
+import threading
 
 from src.agent.openai_agent import Agent
 
+# Inputs that end the session (case-insensitive)
+_EXITS = frozenset(("exit", "quit"))
+
+
+async def read_input(prompt: str) -> str:
+    """
+    Read a line from stdin without blocking the event loop.
+
+    The blocking input() call runs in a daemon thread, so background tasks
+    keep running while the user types and an abandoned read never keeps
+    the process alive on exit.
+
+    Args:
+        prompt (str): The prompt to display
+
+    Returns:
+        str: The line entered by the user
+
+    Raises:
+        EOFError: If stdin is closed
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(setter, value):
+        """Settle the future unless the waiting task was already cancelled."""
+        if not future.done():
+            setter(value)
+
+    def reader():
+        """Run the blocking read and hand the outcome to the event loop."""
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(resolve, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(resolve, future.set_result, line)
+
+    threading.Thread(target=reader, daemon=True).start()
+    return await future
+
 
 async def main():
     """
@@ -33,16 +75,19 @@ async def main():
         print("\n\nWelcome to Merlin!")
         while True:
             try:
-                user_input = input(">>> ")
-                if user_input.lower() in ["exit", "quit"]:
+                user_input = await read_input(">>> ")
+                stripped = user_input.strip()
+                if len(stripped) <= 4 and stripped.lower() in _EXITS:
                     break
                 await agent.run(user_input)
-            except (EOFError, KeyboardInterrupt):
+            except (EOFError, KeyboardInterrupt, asyncio.CancelledError):
+                # asyncio.run turns Ctrl+C into a cancellation of this task
                 break
             except Exception as e:
                 print(f"Error processing input: {str(e)}")
                 print("Please try again with a different query.")
 
+        await agent.aclose()
         print("Goodbye!")
     except ValueError as e:
         # Handle initialization errors (e.g., from missing env variables)
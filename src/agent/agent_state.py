@@ -17,7 +17,9 @@ class AgentState:
 
     Attributes:
         working_dir (str): The current working directory for command execution
-        messages (list): The full message history for the OpenAI API
+        messages (list): The full message history for the OpenAI API. It is
+                         passed to the API by reference, so it must only be
+                         modified by appending between requests.
         last_command_result (str): Output from the most recently executed command
         conversation_history (list): Tuples of (role, content) for the conversation
     """
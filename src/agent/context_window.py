@@ -0,0 +1,148 @@
+"""
+This file contains the context window helpers.
+
+It is responsible for keeping the conversation sent to the model within a token budget.
+"""
+from functools import lru_cache
+import tiktoken
+
+from src.utils.config import config
+
+# Tool outputs shorter than this are cheaper to repeat than to reference
+_MIN_DEDUPE_CHARS = 200
+
+# Approximate per-message token overhead of the chat format
+_MESSAGE_OVERHEAD = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """
+    Get the tokenizer for the configured model.
+
+    tiktoken downloads its BPE files on first use, so loading can fail when
+    offline. The failure is reported once and not retried.
+
+    Returns:
+        tiktoken.Encoding or None: The model's encoding, o200k_base for unknown
+                                   models, or None if it could not be loaded
+    """
+    try:
+        try:
+            return tiktoken.encoding_for_model(config.MODEL_NAME)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"- WARNING: Cannot load tokenizer ({str(e)}), estimating token counts")
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _count_text(text: str):
+    """
+    Count the tokens in a string.
+
+    Falls back to an estimate of one token per four characters when the
+    tokenizer is unavailable or fails.
+
+    Args:
+        text (str): The text to tokenize
+
+    Returns:
+        int: The number of tokens
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        try:
+            return len(encoding.encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    return len(text) // 4
+
+
+def count_tokens(message: dict):
+    """
+    Estimate the number of prompt tokens a message costs.
+
+    Args:
+        message (dict): A chat message
+
+    Returns:
+        int: The estimated token count, including tool call arguments
+    """
+    tokens = _MESSAGE_OVERHEAD + _count_text(message.get("content") or "")
+    for call in message.get("tool_calls") or []:
+        tokens += _count_text(call["function"]["name"])
+        tokens += _count_text(call["function"]["arguments"])
+    return tokens
+
+
+def _dedupe_tool_outputs(messages: list):
+    """
+    Replace repeated large tool outputs with a reference to the first one.
+
+    Args:
+        messages (list): The conversation messages
+
+    Returns:
+        list: The messages, with repeated tool outputs replaced by copies
+              pointing at the tool_call_id that first produced them. The
+              input list itself is returned if nothing was replaced.
+    """
+    first_ids = {}
+    result = None  # Copied lazily, on the first replacement
+
+    for i, message in enumerate(messages):
+        content = message.get("content")
+        if message["role"] == "tool" and content and len(content) >= _MIN_DEDUPE_CHARS:
+            first_id = first_ids.setdefault(content, message["tool_call_id"])
+            if first_id != message["tool_call_id"]:
+                if result is None:
+                    result = messages[:i]
+                result.append({**message, "content": f"Same output as tool_call_id={first_id}"})
+                continue
+        if result is not None:
+            result.append(message)
+
+    return messages if result is None else result
+
+
+def prune_messages(messages: list, max_tokens: int):
+    """
+    Fit a conversation into a token budget before sending it to the model.
+
+    Whole turns (a user message and everything that follows it up to the
+    next user message) are dropped from the oldest end until the
+    conversation fits, which keeps every tool call paired with its tool
+    responses. Repeated tool outputs among the kept messages are then
+    deduplicated.
+
+    Args:
+        messages (list): The conversation messages, system prompt first
+        max_tokens (int): The token budget for the whole conversation
+
+    Returns:
+        list: The messages to send. The system prompt and the latest turn
+              are always kept, even if they alone exceed the budget. When
+              nothing needs to change, the input list itself is returned
+              rather than a copy.
+    """
+    if not messages:
+        return messages
+
+    # Walk back from the newest message; a turn closes at its user message
+    budget = max_tokens - count_tokens(messages[0])
+    cut = len(messages)
+    turn_cost = 0
+    for i in range(len(messages) - 1, 0, -1):
+        turn_cost += count_tokens(messages[i])
+        if messages[i]["role"] == "user" or i == 1:
+            if cut < len(messages) and turn_cost > budget:
+                break
+            budget -= turn_cost
+            turn_cost = 0
+            cut = i
+
+    if cut > 1:
+        messages = messages[:1] + messages[cut:]
+    return _dedupe_tool_outputs(messages)
@@ -0,0 +1,89 @@
+"""
+This file contains the conversation journal.
+
+It is responsible for persisting conversation messages to disk without blocking the agent.
+"""
+import os
+import queue
+import threading
+
+# Marks the end of the queue when the journal is closed
+_CLOSE = object()
+
+
+class ConversationJournal:
+    """
+    Append-only JSON Lines log of conversation messages.
+
+    Appends are queued and written by a background thread, so the agent
+    never waits on disk I/O between turns. The writer drains everything
+    queued since its last write and submits it with a single write call.
+    If a write fails, the error is reported once and the journal is
+    disabled; later records are discarded instead of piling up in memory.
+
+    Attributes:
+        path (str): The journal file path
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the journal file and start the background writer.
+
+        Args:
+            path (str): The journal file path (can use ~). Created if missing,
+                        existing content is preserved.
+        """
+        self.path = os.path.expanduser(path)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._queue = queue.SimpleQueue()
+        self._disabled = False
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def append(self, record: bytes):
+        """
+        Queue a record to be written as one line of the journal.
+
+        Args:
+            record (bytes): The serialized record, without a trailing newline
+        """
+        if self._disabled:
+            return
+        self._queue.put(record + b"\n")
+
+    def close(self):
+        """
+        Flush all queued records and close the journal file.
+        """
+        self._queue.put(_CLOSE)
+        self._writer.join()
+        os.close(self._fd)
+
+    def _write_loop(self):
+        """
+        Write queued records in batches until the journal is closed.
+        """
+        closing = False
+        while not closing:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if batch[-1] is _CLOSE:
+                closing = True
+                batch.pop()
+
+            if self._disabled:
+                continue  # Keep draining until close() so it never blocks
+
+            data = b"".join(batch)
+            try:
+                while data:
+                    written = os.write(self._fd, data)
+                    data = data[written:]
+            except OSError as e:
+                self._disabled = True
+                print(f"- WARNING: Cannot write conversation journal {self.path} ({str(e)}), journal disabled")
@@ -3,17 +3,211 @@ This file contains the OpenAI agent.
 
 It is responsible for interacting with the OpenAI API.
 """
-import json
-from openai import AsyncOpenAI
+import asyncio
+import hashlib
+import sys
+from collections import OrderedDict
+import httpx
+import orjson
+from openai import (APIConnectionError, APITimeoutError, AsyncOpenAI,
+                    InternalServerError, RateLimitError)
+from tenacity import (retry, retry_if_exception_type, stop_after_attempt,
+                      wait_exponential)
 
 from src.agent.agent_state import state
+from src.agent.context_window import prune_messages
+from src.agent.conversation_journal import ConversationJournal
 from src.tools.directory_manager import directory_manager
-from src.tools.command_executor import execute_commands
+from src.tools.command_executor import close_shells, execute_commands
 from src.tools.vector_search import search as vector_search
+from src.utils.async_batcher import AsyncBatcher
 from src.utils.config import config
 from src.utils.tools_config import TOOLS
 
-client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
+# One pooled HTTP/2 connection multiplexes concurrent requests over a single TLS session
+_http = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+    timeout=httpx.Timeout(60.0, connect=5.0)
+)
+# Retries are handled by _call_openai, not by the SDK
+client = AsyncOpenAI(api_key=config.OPENAI_API_KEY, http_client=_http, max_retries=0)
+
+
+@retry(
+    retry=retry_if_exception_type(
+        (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    stop=stop_after_attempt(5),
+    reraise=True
+)
+async def _call_openai(messages, tools):
+    """
+    Issue a streamed completion request, retrying transient failures.
+
+    Rate limits, connection errors, timeouts and 5xx responses are retried
+    with exponential backoff (1s, 2s, 4s, ...) up to five attempts. Other
+    errors, such as invalid requests, are raised immediately.
+
+    Args:
+        messages (list): The conversation to send
+        tools (list): The tool definitions available to the model
+
+    Returns:
+        The async chunk iterator returned by the OpenAI API
+    """
+    return await client.chat.completions.create(
+        model=config.MODEL_NAME,
+        messages=messages,
+        tools=tools,
+        tool_choice="auto",
+        stream=True
+    )
+
+
+class _PermitStream:
+    """
+    A completion stream that holds a concurrency permit until it is done.
+
+    The permit is released once the stream is exhausted, fails or is closed.
+    """
+
+    def __init__(self, stream, semaphore):
+        """
+        Wrap a stream whose request already acquired the semaphore.
+
+        Args:
+            stream (openai.AsyncStream): The raw streamed response returned by
+                                         the OpenAI API
+            semaphore (asyncio.Semaphore): The semaphore to release when done
+        """
+        self._stream = stream
+        self._semaphore = semaphore
+        self._released = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._release()
+            raise
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        """
+        Close the underlying stream and release the permit.
+        """
+        self._release()
+        await self._stream.close()
+
+    def _release(self):
+        """
+        Release the permit, at most once.
+        """
+        if not self._released:
+            self._released = True
+            self._semaphore.release()
+
+
+class CompletionBatcher(AsyncBatcher):
+    """
+    Coalesces chat completion requests from concurrent agent turns.
+
+    Each queued item is a (messages, tools) tuple. A batch is dispatched as
+    a fan-out of streamed completion requests, bounded by a semaphore so
+    bursts of turns stay within the API's rate limits. A request keeps its
+    permit until its response stream has been fully consumed or closed.
+
+    Attributes:
+        concurrency (int): Maximum number of requests in flight at once,
+                           counting responses that are still streaming
+    """
+
+    def __init__(self, concurrency: int = 8, **kwargs):
+        """
+        Initialize the batcher.
+
+        Args:
+            concurrency (int, optional): Maximum number of requests in flight
+                                         at once. Defaults to 8.
+            **kwargs: Passed through to AsyncBatcher
+        """
+        super().__init__(**kwargs)
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _create(self, messages, tools):
+        """
+        Issue a single streamed completion request under the semaphore.
+
+        Args:
+            messages (list): The conversation to send
+            tools (list): The tool definitions available to the model
+
+        Returns:
+            _PermitStream: The response stream, holding its permit until
+                           consumed or closed
+        """
+        await self._semaphore.acquire()
+        try:
+            stream = await _call_openai(messages, tools)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return _PermitStream(stream, self._semaphore)
+
+    async def process_batch(self, items: list):
+        """
+        Dispatch every queued request concurrently.
+
+        Args:
+            items (list): Tuples of (messages, tools)
+
+        Returns:
+            list: One stream (or exception) per item, in submission order
+        """
+        return await asyncio.gather(
+            *(self._create(messages, tools) for messages, tools in items),
+            return_exceptions=True
+        )
+
+    async def discard(self, result):
+        await result.aclose()
+
+
+# Singleton instance
+batcher = CompletionBatcher(max_batch_size=16, max_queue_time=0.02)
+
+# Tools that change shared state (e.g. the working directory); calls to
+# them run one at a time, in the order the model issued them
+_SEQUENTIAL_TOOLS = frozenset(("execute_commands",))
+
+# LRU cache of plain text replies keyed by request digest
+_CACHE_SIZE = 128
+_completion_cache = OrderedDict()
+
+
+def _request_digest(messages, tools):
+    """
+    Compute a stable digest identifying a completion request.
+
+    Args:
+        messages (list): The conversation to send
+        tools (list): The tool definitions available to the model
+
+    Returns:
+        str: A hex SHA-256 digest of the canonical JSON request
+    """
+    payload = orjson.dumps(
+        {"model": config.MODEL_NAME, "messages": messages, "tools": tools},
+        option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.sha256(payload).hexdigest()
 
 
 class Agent:
@@ -40,13 +234,197 @@ class Agent:
         else:
             self.system_prompt = f"You are a terminal assistant.\n\nKnown directories:\n{directory_info}"
 
+        # Built once and never modified: OpenAI's prompt caching only applies
+        # when the start of every request is byte-identical. Directory changes
+        # during a session are deliberately not reflected in it.
+        self._system_msg = {"role": "system", "content": self.system_prompt}
+
+        # Optional on-disk log of the conversation
+        self.journal = ConversationJournal(config.JOURNAL_PATH) if config.JOURNAL_PATH else None
+
+    async def aclose(self):
+        """
+        Release resources held by the agent.
+
+        Stops the pooled shell workers, closes the HTTP connection pool and
+        flushes and closes the conversation journal, if enabled.
+        """
+        await close_shells()
+        await _http.aclose()
+        if self.journal:
+            await asyncio.to_thread(self.journal.close)
+            self.journal = None
+
+    @staticmethod
+    async def _consume_stream(stream):
+        """
+        Consume a streamed chat completion, printing text as it arrives.
+
+        Content deltas are written to stdout immediately, while tool call
+        fragments are merged by their index so that the function name and
+        arguments are concatenated across chunks.
+
+        Args:
+            stream (_PermitStream): The response stream from the batcher;
+                                    it is always closed on return
+
+        Returns:
+            dict: The reconstructed assistant message, with "content" set to
+                  None when no text was produced and "tool_calls" holding a
+                  (possibly empty) list of tool call dicts
+        """
+        content_parts = []
+        tool_calls = {}
+
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+
+                if delta.content:
+                    content_parts.append(delta.content)
+                    sys.stdout.write(delta.content)
+                    sys.stdout.flush()
+
+                for call in delta.tool_calls or []:
+                    entry = tool_calls.setdefault(call.index, {
+                        "id": "",
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""}
+                    })
+                    if call.id:
+                        entry["id"] = call.id
+                    if call.function:
+                        if call.function.name:
+                            entry["function"]["name"] += call.function.name
+                        if call.function.arguments:
+                            entry["function"]["arguments"] += call.function.arguments
+        finally:
+            # Frees the batcher's concurrency permit, even if consumption fails
+            await stream.aclose()
+
+        if content_parts:
+            # Terminate the streamed line
+            print()
+
+        return {
+            "role": "assistant",
+            "content": "".join(content_parts) or None,
+            "tool_calls": [tool_calls[i] for i in sorted(tool_calls)]
+        }
+
+    @staticmethod
+    async def _dispatch_tool(call):
+        """
+        Execute a single tool call requested by the model.
+
+        Args:
+            call (dict): A tool call dict as produced by _consume_stream
+
+        Returns:
+            dict: The tool message to feed back to the model
+        """
+        fn_name = call["function"]["name"]
+        args = orjson.loads(call["function"]["arguments"] or "{}")
+
+        if fn_name == "execute_commands":
+            output = await execute_commands(**args)
+        elif fn_name == "vector_search":
+            # The search walks the filesystem, keep it off the event loop
+            paths = await asyncio.to_thread(vector_search, **args)
+            # Compact UTF-8 JSON keeps the tool output short in tokens
+            output = orjson.dumps(paths).decode()
+        else:
+            output = f"Unknown tool {fn_name}"
+
+        return {
+            "role": "tool",
+            "tool_call_id": call["id"],
+            "name": fn_name,
+            "content": output
+        }
+
+    async def _dispatch_tools(self, calls):
+        """
+        Execute all tool calls of one assistant message.
+
+        Calls to side-effect free tools run concurrently. Calls to tools in
+        _SEQUENTIAL_TOOLS run one at a time in call order, so a 'cd' in one
+        call only affects the calls issued after it.
+
+        Args:
+            calls (list): Tool call dicts as produced by _consume_stream
+
+        Returns:
+            list: One tool message per call, in call order. A failing call
+                  yields an error message instead of raising.
+        """
+        results = [None] * len(calls)
+
+        async def run_one(i):
+            """Run call i, turning a failure into an error tool message."""
+            try:
+                results[i] = await self._dispatch_tool(calls[i])
+            except Exception as e:
+                results[i] = {
+                    "role": "tool",
+                    "tool_call_id": calls[i]["id"],
+                    "name": calls[i]["function"]["name"],
+                    "content": f"Error: {str(e)}"
+                }
+
+        async def run_in_order(indices):
+            """Run the given calls one after another."""
+            for i in indices:
+                await run_one(i)
+
+        sequential = [i for i, call in enumerate(calls)
+                      if call["function"]["name"] in _SEQUENTIAL_TOOLS]
+        concurrent = [i for i, call in enumerate(calls)
+                      if call["function"]["name"] not in _SEQUENTIAL_TOOLS]
+
+        await asyncio.gather(run_in_order(sequential), *(run_one(i) for i in concurrent))
+        return results
+
+    async def _cached_completion(self, messages, tools):
+        """
+        Get the assistant message for a request, reusing identical past requests.
+
+        Only plain text replies are cached: replies requesting tool calls
+        always go to the API so the tools run against the current state.
+
+        Args:
+            messages (list): The conversation to send
+            tools (list): The tool definitions available to the model
+
+        Returns:
+            dict: The assistant message, as returned by _consume_stream
+        """
+        key = _request_digest(messages, tools)
+        cached = _completion_cache.get(key)
+        if cached is not None:
+            _completion_cache.move_to_end(key)
+            print(cached["content"])
+            return dict(cached)
+
+        stream = await batcher.process((messages, tools))
+        msg = await self._consume_stream(stream)
+
+        if not msg["tool_calls"] and msg["content"] is not None:
+            _completion_cache[key] = dict(msg)
+            if len(_completion_cache) > _CACHE_SIZE:
+                _completion_cache.popitem(last=False)
+
+        return msg
+
     async def run(self, user_text: str):
         """
         Process a user message and generate a response using the OpenAI API.
 
         This method handles the complete interaction cycle:
         1. Adding the user message to the conversation history
-        2. Sending the conversation to the OpenAI API
+        2. Sending the conversation, trimmed to the token budget, to the OpenAI API
         3. Processing any tool calls requested by the model
         4. Handling the model's text response
         5. Updating the conversation history
@@ -61,12 +439,13 @@ class Agent:
             - Updates the agent's state and conversation history
             - Executes commands if requested by the model
             - Prints the model's response to the console
+            - Appends the turn's messages to the journal, if enabled
         """
+        first_new = len(state.messages)
+
         # Add system message on first turn
         if not state.messages:
-            state.messages.append(
-                {"role": "system", "content": self.system_prompt}
-            )
+            state.messages.append(self._system_msg)
 
         # Add user message
         state.messages.append({"role": "user", "content": user_text})
@@ -75,52 +454,24 @@ class Agent:
         # Main interaction loop
         while True:
             try:
-                # Get response from OpenAI
-                rsp = await client.chat.completions.create(
-                    model=config.MODEL_NAME,
-                    messages=list(state.messages),
-                    tools=TOOLS,
-                    tool_choice="auto"
-                )
-                msg = rsp.choices[0].message
+                # Stream response from OpenAI (or replay a cached reply)
+                # Passed by reference when nothing is pruned; the SDK does not mutate it
+                messages = prune_messages(state.messages, config.MAX_CONTEXT_TOKENS)
+                msg = await self._cached_completion(messages, TOOLS)
 
                 # Handle tool calls
-                if msg.tool_calls:
-                    tool_call_msgs = []
-
-                    for call in msg.tool_calls:
-                        fn_name = call.function.name
-                        args = json.loads(call.function.arguments or "{}")
-
-                        if fn_name == "execute_commands":
-                            output = await execute_commands(**args)
-                        elif fn_name == "vector_search":
-                            paths = vector_search(**args)
-                            output = json.dumps(paths)
-                        else:
-                            output = f"Unknown tool {fn_name}"
-
-                        tool_call_msgs.append({
-                            "role": "tool",
-                            "tool_call_id": call.id,
-                            "name": fn_name,
-                            "content": output
-                        })
+                if msg["tool_calls"]:
+                    tool_call_msgs = await self._dispatch_tools(msg["tool_calls"])
 
                     # Add assistant message and tool responses
-                    state.messages.append({
-                        "role": "assistant",
-                        "content": msg.content,
-                        "tool_calls": msg.tool_calls
-                    })
+                    state.messages.append(msg)
                     state.messages.extend(tool_call_msgs)
 
                     # Continue loop to feed results back to model
                     continue
 
-                # Handle plain text reply
-                content = msg.content.strip()
-                print(content)
+                # Handle plain text reply (already streamed to the console)
+                content = (msg["content"] or "").strip()
 
                 # Save to conversation history
                 state.messages.append(
@@ -132,3 +483,7 @@ class Agent:
             except Exception as e:
                 print(f"Error: {str(e)}")
                 break
+
+        if self.journal:
+            for message in state.messages[first_new:]:
+                self.journal.append(orjson.dumps(message))
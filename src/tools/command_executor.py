@@ -4,13 +4,188 @@ This file contains the command executor tool.
 It is responsible for executing shell commands.
 """
 import asyncio
+import os
 import shlex
+import signal
+import uuid
 from pathlib import Path
 
 from src.agent.agent_state import state
+from src.utils.config import config
 
+# Separates command output from the sentinel that ends it
+_SEP = b"\x1e"
 
-async def _run(cmd: str):
+
+class ShellWorker:
+    """
+    A long-lived bash process that runs commands one at a time.
+
+    Reusing one shell avoids an exec of /bin/sh for every command. Each
+    command runs in a subshell, so 'cd', 'export', 'set', 'exit' and
+    redirections like 'exec 1>/dev/null' never leak into later commands.
+    The command is sent as a shell-quoted string to 'eval', so malformed
+    input fails with a syntax error instead of leaving the shell waiting
+    for more input. After the command, a sentinel carrying a unique marker
+    and the exit code is printed to stdout and stderr, which tells us where
+    the command's output ends.
+
+    Any failure to read a sentinel kills the shell's whole process group;
+    a killed worker must not be reused.
+    """
+
+    def __init__(self):
+        """
+        Initialize a worker; the shell itself is started on first use.
+        """
+        self._process = None
+        self._killed = False
+
+    @property
+    def alive(self):
+        """
+        bool: Whether the shell process is running and may be reused.
+        """
+        return (self._process is not None and not self._killed
+                and self._process.returncode is None)
+
+    async def run(self, cmd: str, cwd: str, max_output_bytes: int = None):
+        """
+        Run a command in the given directory and wait for it to finish.
+
+        Args:
+            cmd (str): The shell command to execute
+            cwd (str): The directory to run the command in
+            max_output_bytes (int, optional): Keep at most this many bytes of
+                                              each of stdout and stderr.
+                                              Defaults to no limit.
+
+        Returns:
+            tuple: (return_code, stdout bytes, stderr bytes)
+
+        Note:
+            If either stream ends before its sentinel (e.g. the command
+            killed the shell), the shell is killed and its exit status is
+            returned. The worker is then dead and must not be reused.
+        """
+        if self._process is None:
+            # Own session, so kill() can take down the command's children too
+            self._process = await asyncio.create_subprocess_exec(
+                "bash", "--noprofile", "--norc",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+
+        marker = uuid.uuid4().hex
+        script = (
+            f"( cd -- {shlex.quote(cwd)} && eval {shlex.quote(cmd)} ) < /dev/null\n"
+            f"printf '\\036%s:%d\\036' {marker} $?\n"
+            f"printf '\\036%s:\\036' {marker} >&2\n"
+        )
+
+        try:
+            self._process.stdin.write(script.encode())
+            await self._process.stdin.drain()
+            (out, code), (err, err_done) = await asyncio.gather(
+                self._read_output(self._process.stdout, marker, max_output_bytes),
+                self._read_output(self._process.stderr, marker, max_output_bytes)
+            )
+
+            if code is None or err_done is None:
+                # A stream ended without its sentinel: the shell is unusable
+                self.kill()
+                code = await self._process.wait()
+        except BaseException:
+            # Output is out of sync with our sentinels; discard the shell
+            self.kill()
+            raise
+
+        return int(code), out, err
+
+    def kill(self):
+        """
+        Kill the shell and everything it started, and retire the worker.
+        """
+        if self._process is None or self._killed:
+            return
+        self._killed = True
+        try:
+            os.killpg(self._process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass  # Already exited
+
+    async def close(self):
+        """
+        Terminate the shell process and wait for it to exit.
+        """
+        self.kill()
+        if self._process is not None:
+            await self._process.wait()
+
+    @staticmethod
+    async def _read_output(stream, marker: str, max_output_bytes: int = None):
+        """
+        Read a stream up to the sentinel for the given marker.
+
+        Output beyond max_output_bytes is counted but not stored, so memory
+        stays bounded however much the command prints.
+
+        Args:
+            stream (asyncio.StreamReader): The shell's stdout or stderr
+            marker (str): The unique marker of the current command
+            max_output_bytes (int, optional): Keep at most this many bytes of
+                                              output. Defaults to no limit.
+
+        Returns:
+            tuple: (output bytes, sentinel payload) where the payload is None
+                   if the stream ended before the sentinel was seen. Truncated
+                   output ends with a note of how many bytes were dropped.
+        """
+        start = _SEP + marker.encode() + b":"
+        output = bytearray()
+        dropped = 0
+        buf = bytearray()  # Unsettled tail that may hold (part of) the sentinel
+
+        def keep(data):
+            """Store data up to the limit and count the rest."""
+            nonlocal dropped
+            room = len(data) if max_output_bytes is None else max(0, max_output_bytes - len(output))
+            output.extend(data[:room])
+            dropped += len(data) - min(room, len(data))
+
+        def finish(payload):
+            """Build the result tuple."""
+            if dropped:
+                output.extend(b"\n[truncated %d bytes]" % dropped)
+            return bytes(output), payload
+
+        while True:
+            idx = buf.find(start)
+            if idx != -1:
+                end = buf.find(_SEP, idx + len(start))
+                if end != -1:
+                    keep(buf[:idx])
+                    return finish(buf[idx + len(start):end].decode())
+            elif len(buf) > len(start):
+                # Only the last bytes can begin a sentinel split across reads
+                settled = len(buf) - len(start)
+                keep(buf[:settled])
+                del buf[:settled]
+
+            chunk = await stream.read(65536)
+            if not chunk:
+                keep(buf)
+                return finish(None)
+            buf += chunk
+
+
+# Idle shell workers, reused across commands
+_idle_workers = []
+
+
+async def _run(cmd: str, max_output_bytes: int = None):
     """
     Run a single shell command in the current working directory.
 
@@ -19,29 +194,86 @@ async def _run(cmd: str):
 
     Args:
         cmd (str): The shell command to execute
+        max_output_bytes (int, optional): Keep at most this many bytes of each
+                                          of stdout and stderr. Defaults to
+                                          no limit.
 
     Returns:
         tuple: A 3-tuple containing:
             - return_code (int): The exit code of the command (0 for success)
-            - stdout (str): The standard output of the command
-            - stderr (str): The standard error output of the command
+            - stdout (bytes): The standard output of the command
+            - stderr (bytes): The standard error output of the command
 
     Note:
-        Uses asyncio.create_subprocess_shell for asynchronous execution
+        Commands run on a pooled ShellWorker, so concurrent calls each get
+        their own shell. Output is kept as bytes; execute_commands decodes
+        the aggregated result once.
+    """
+    worker = _idle_workers.pop() if _idle_workers else ShellWorker()
+    try:
+        return await worker.run(cmd, state.working_dir, max_output_bytes)
+    finally:
+        if worker.alive:
+            _idle_workers.append(worker)
+
+
+async def close_shells():
     """
-    process = await asyncio.create_subprocess_shell(
-        cmd,
-        cwd=state.working_dir,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    stdout, stderr = await process.communicate()
-    return process.returncode, stdout.decode(), stderr.decode()
+    Terminate all idle shell workers.
+    """
+    while _idle_workers:
+        await _idle_workers.pop().close()
 
 
-async def execute_commands(commands: list[str], background: bool = False):
+def _change_dir(raw: str):
     """
-    Execute shell commands sequentially and return their results.
+    Apply a 'cd' command to the agent's working directory.
+
+    Args:
+        raw (str): The 'cd' command string
+
+    Returns:
+        bytes: A message describing the outcome of the directory change
+    """
+    # Update working dir locally; no subprocess needed
+    target = Path(shlex.split(raw)[1]).expanduser().resolve()
+    if target.exists() and target.is_dir():
+        state.working_dir = str(target)
+        return f"Changed directory to {target}".encode()
+    return f"Directory not found: {target}".encode()
+
+
+async def _run_segment(segment: list[str], max_output_bytes: int = None):
+    """
+    Run a batch of independent commands concurrently.
+
+    Args:
+        segment (list[str]): Commands that share the same working directory
+        max_output_bytes (int, optional): Limit for each command's stdout and
+                                          stderr. Defaults to no limit.
+
+    Returns:
+        list[bytes]: The formatted result of each command, in submission order
+    """
+    outcomes = await asyncio.gather(*(_run(raw, max_output_bytes) for raw in segment))
+    results = []
+    for raw, (code, out, err) in zip(segment, outcomes):
+        result = bytearray(b"$ ")
+        result += raw.encode()
+        result += b"\nexit=%d\nstdout:\n" % code
+        result += out
+        result += b"\nstderr:\n"
+        result += err
+        results.append(result)
+    if results:
+        state.last_command_result = results[-1].decode(errors="replace")
+    return results
+
+
+async def execute_commands(commands: list[str], background: bool = False,
+                           parallel: bool = False, max_output_bytes: int = None):
+    """
+    Execute shell commands and return their results.
 
     This function handles multiple commands, executing them in order and
     collecting their outputs. It has special handling for 'cd' commands
@@ -52,6 +284,14 @@ async def execute_commands(commands: list[str], background: bool = False):
         background (bool, optional): Whether to run commands in background
                                      without waiting for their completion.
                                      Defaults to False.
+        parallel (bool, optional): Whether the commands are independent of
+                                   each other and may run concurrently. 'cd'
+                                   commands still act as barriers between
+                                   concurrent batches. Defaults to False.
+        max_output_bytes (int, optional): Truncate each command's stdout and
+                                          stderr to this many bytes while
+                                          reading them. Defaults to
+                                          config.MAX_OUTPUT_BYTES.
 
     Returns:
         str: A string containing the aggregated results of all commands,
@@ -67,18 +307,21 @@ async def execute_commands(commands: list[str], background: bool = False):
         >>> await execute_commands(["ls -la", "echo hello"])
         "$ ls -la\nexit=0\nstdout:\nfile1 file2...\nstderr:\n\n$ echo hello\nexit=0\nstdout:\nhello\nstderr:\n"
     """
+    if max_output_bytes is None:
+        max_output_bytes = config.MAX_OUTPUT_BYTES or None  # 0 means no limit
+
     aggregated = []
+    segment = []
 
     for raw in commands:
+        raw = raw.lstrip()
+
         # Handle cd command specially
-        if raw.startswith("cd "):
-            # Update working dir locally; no subprocess needed
-            target = Path(shlex.split(raw)[1]).expanduser().resolve()
-            if target.exists() and target.is_dir():
-                state.working_dir = str(target)
-                aggregated.append(f"Changed directory to {target}")
-            else:
-                aggregated.append(f"Directory not found: {target}")
+        if raw[:3] == "cd ":
+            # Finish the commands queued before the directory change
+            aggregated.extend(await _run_segment(segment, max_output_bytes))
+            segment = []
+            aggregated.append(_change_dir(raw))
             continue
 
         # Execute regular commands
@@ -90,11 +333,13 @@ async def execute_commands(commands: list[str], background: bool = False):
                 stderr=asyncio.subprocess.DEVNULL,
                 start_new_session=True
             )
-            aggregated.append(f"Started in background: {raw}")
+            aggregated.append(f"Started in background: {raw}".encode())
+        elif parallel:
+            segment.append(raw)
         else:
-            code, out, err = await _run(raw)
-            result = f"$ {raw}\nexit={code}\nstdout:\n{out}\nstderr:\n{err}"
-            aggregated.append(result)
-            state.last_command_result = result
+            aggregated.extend(await _run_segment([raw], max_output_bytes))
+
+    aggregated.extend(await _run_segment(segment, max_output_bytes))
 
-    return "\n\n".join(aggregated)
+    # Decode once, at the boundary
+    return b"\n\n".join(aggregated).decode(errors="replace")
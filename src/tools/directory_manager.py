@@ -4,11 +4,86 @@ This file contains the directory manager tool.
 It is responsible for tracking and managing directories available to the agent.
 """
 import os
+import threading
 from pathlib import Path
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
 
 from src.utils.config import config
 
 
+def _walk_files(root):
+    """
+    Yield every file below a directory using an iterative os.scandir walk.
+
+    Entries are classified like os.walk does: symlinked directories are
+    neither descended into nor reported, and unreadable directories are
+    skipped.
+
+    Args:
+        root (str): The directory to walk
+
+    Yields:
+        tuple: (path, lowercased file name) for each file found
+    """
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                # Like os.walk, an entry that cannot be stat'ed (e.g. a
+                # symlink loop) counts as a non-directory
+                try:
+                    is_real_dir = e.is_dir(follow_symlinks=False)
+                    is_dir = is_real_dir or e.is_dir()
+                except OSError:
+                    is_real_dir = is_dir = False
+                if is_real_dir:
+                    stack.append(e.path)
+                elif not is_dir:
+                    yield e.path, e.name.lower()
+
+
+class _IndexEventHandler(FileSystemEventHandler):
+    """
+    Keeps a DirectoryManager file index in sync with filesystem events.
+    """
+
+    def __init__(self, manager):
+        """
+        Initialize the handler for a directory manager.
+
+        Args:
+            manager (DirectoryManager): The manager whose index to update
+        """
+        super().__init__()
+        self.manager = manager
+
+    def on_any_event(self, event):
+        """
+        Apply a filesystem event to the index.
+
+        Failures are reported instead of raised, since an exception would
+        stop the observer's dispatch thread and leave the index stale.
+
+        Args:
+            event (FileSystemEvent): The event to apply
+        """
+        try:
+            if event.event_type == "created":
+                self.manager.index_path(event.src_path, event.is_directory)
+            elif event.event_type == "deleted":
+                self.manager.unindex_path(event.src_path, event.is_directory)
+            elif event.event_type == "moved":
+                self.manager.unindex_path(event.src_path, event.is_directory)
+                self.manager.index_path(event.dest_path, event.is_directory)
+        except OSError as e:
+            print(f"- WARNING: Cannot update file index for {event.src_path} ({str(e)})")
+
+
 class DirectoryManager:
     """
     Manages the directories accessible to the agent.
@@ -18,6 +93,11 @@ class DirectoryManager:
     It allows adding new directories, retrieving directory paths by alias,
     and listing all managed directories.
 
+    It also keeps an in-memory index of every file below the managed
+    directories. The index is built in a background thread at startup
+    and then kept up to date from filesystem events, so searches never
+    need to walk the disk.
+
     Attributes:
         directories (dict): A dictionary mapping directory aliases to absolute paths
     """
@@ -29,8 +109,21 @@ class DirectoryManager:
         The directories are loaded from the configuration object, which
         typically reads them from environment variables in .env file.
         """
-        # Only uses directories defined in .env
-        self.directories = config.directories
+        # Only uses directories defined in .env; copied so that added
+        # directories do not leak into the shared configuration
+        self.directories = dict(config.directories)
+        self._formatted = None
+
+        # File index: absolute path -> lowercased file name
+        self._index = {}
+        self._index_lock = threading.Lock()
+        self._index_ready = threading.Event()
+        self._snapshot = None
+
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.start()
+        threading.Thread(target=self._build_index, daemon=True).start()
 
     def get_all_directories(self) -> str:
         """
@@ -48,9 +141,12 @@ class DirectoryManager:
             >>> directory_manager.get_all_directories()
             "home: /home/user\nwork: /path/to/work\ncwd: /current/directory"
         """
-        if not self.directories:
-            return "No specific directories configured."
-        return "\n".join(f"{k}: {v}" for k, v in self.directories.items())
+        if self._formatted is None:
+            if not self.directories:
+                self._formatted = "No specific directories configured."
+            else:
+                self._formatted = "\n".join(f"{k}: {v}" for k, v in self.directories.items())
+        return self._formatted
 
     def add_directory(self, name, path):
         """
@@ -73,6 +169,9 @@ class DirectoryManager:
         abs_path = str(Path(path).expanduser().resolve())
         if os.path.isdir(abs_path):
             self.directories[name] = abs_path
+            self._formatted = None
+            self._watch(abs_path)
+            self.index_path(abs_path, True)
             return True
         return False
 
@@ -93,6 +192,80 @@ class DirectoryManager:
         """
         return self.directories.get(name)
 
+    def get_file_index(self):
+        """
+        Return a snapshot of the file index, waiting for the initial build.
+
+        Returns:
+            tuple: (names, paths) where names[i] is the lowercased file name
+                   of paths[i]. The lists must not be modified by callers.
+        """
+        self._index_ready.wait()
+        with self._index_lock:
+            if self._snapshot is None:
+                self._snapshot = (list(self._index.values()), list(self._index))
+            return self._snapshot
+
+    def _build_index(self):
+        """
+        Index and start watching every managed directory.
+        """
+        try:
+            for path in list(self.directories.values()):
+                # Watch first so files created during the walk are not missed
+                self._watch(path)
+                try:
+                    self.index_path(path, True)
+                except OSError as e:
+                    print(f"- WARNING: Cannot index {path} ({str(e)}), search results may be incomplete")
+        finally:
+            # Searches wait for this; never leave them blocked
+            self._index_ready.set()
+
+    def _watch(self, path):
+        """
+        Register a recursive filesystem watch on a directory.
+
+        Args:
+            path (str): The directory to watch
+        """
+        try:
+            self._observer.schedule(_IndexEventHandler(self), path, recursive=True)
+        except OSError as e:
+            print(f"- WARNING: Cannot watch {path} for changes ({str(e)}), search results may be stale")
+
+    def index_path(self, path, is_directory):
+        """
+        Add a file, or every file below a directory, to the index.
+
+        Args:
+            path (str): The file or directory path
+            is_directory (bool): Whether the path is a directory
+        """
+        if is_directory:
+            entries = dict(_walk_files(path))
+        else:
+            entries = {path: os.path.basename(path).lower()}
+        with self._index_lock:
+            self._index.update(entries)
+            self._snapshot = None
+
+    def unindex_path(self, path, is_directory):
+        """
+        Remove a file, or every file below a directory, from the index.
+
+        Args:
+            path (str): The file or directory path
+            is_directory (bool): Whether the path is a directory
+        """
+        with self._index_lock:
+            self._index.pop(path, None)
+            if is_directory:
+                prefix = path.rstrip(os.sep) + os.sep
+                for p in [p for p in self._index if p.startswith(prefix)]:
+                    del self._index[p]
+            self._snapshot = None
+
 
 # Singleton instance
 directory_manager = DirectoryManager()
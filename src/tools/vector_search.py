@@ -3,9 +3,8 @@ This file contains the vector search tool.
 
 It is responsible for searching for files matching a query using fuzzy matching.
 """
-import os
-from pathlib import Path
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 
 from src.tools.directory_manager import directory_manager
 from src.utils.config import config
@@ -15,8 +14,8 @@ def search(query: str, top_k: int = None):
     """
     Perform a fuzzy search for files matching the given query.
 
-    This function searches through all configured directories and their
-    subdirectories for files whose names partially match the search query.
+    This function searches the file index of all configured directories and
+    their subdirectories for files whose names partially match the search query.
     The matching is performed using fuzzy string matching algorithm from
     the rapidfuzz library, which allows for typos and partial matches.
 
@@ -42,14 +41,28 @@ def search(query: str, top_k: int = None):
         top_k = config.DEFAULT_SEARCH_RESULTS
 
     threshold = config.FUZZY_SEARCH_THRESHOLD
-    candidates = []
+    q = query.lower()
+    names, paths = directory_manager.get_file_index()
 
-    for root_alias in directory_manager.directories.values():
-        for root, _, files in os.walk(root_alias):
-            for f in files:
-                score = fuzz.partial_ratio(query.lower(), f.lower())
-                if score > threshold:
-                    candidates.append((score, str(Path(root) / f)))
+    # Score all names in one C++ batch spread over every core. partial_ratio
+    # aligns the shorter string itself, so names can be the parallel axis.
+    scores = process.cdist(
+        names, [q],
+        scorer=fuzz.partial_ratio,
+        processor=None,
+        score_cutoff=threshold,
+        workers=-1
+    )[:, 0]
 
-    candidates.sort(reverse=True)  # higher score first
-    return [p for _, p in candidates[:top_k]]
+    hits = np.flatnonzero(scores > threshold)
+    if 0 < top_k < len(hits):
+        # Find the k-th best score in linear time and keep every match that
+        # reaches it, so ties at the cutoff are resolved by path below
+        hit_scores = scores[hits]
+        kth = len(hits) - top_k
+        hits = hits[hit_scores >= np.partition(hit_scores, kth)[kth]]
+
+    # Higher score first, ties by path descending, as a full sort of
+    # (score, path) pairs would give
+    top = sorted(hits.tolist(), key=lambda i: (float(scores[i]), paths[i]), reverse=True)
+    return [paths[i] for i in top[:top_k]]
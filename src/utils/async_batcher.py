@@ -0,0 +1,131 @@
+"""
+This file contains the async request batcher.
+
+It is responsible for coalescing concurrent requests into batches.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+
+
+class AsyncBatcher(ABC):
+    """
+    Coalesces concurrent requests into batches processed together.
+
+    Callers submit items through process() and await their individual
+    results. Items are queued until either max_batch_size items are
+    waiting or the oldest item has waited max_queue_time seconds, at
+    which point the whole queue is handed to process_batch().
+
+    Subclasses must implement process_batch().
+
+    Attributes:
+        max_batch_size (int): Number of queued items that triggers an immediate flush
+        max_queue_time (float): Maximum time in seconds an item waits before a flush
+    """
+
+    def __init__(self, max_batch_size: int = 16, max_queue_time: float = 0.02):
+        """
+        Initialize an empty batcher.
+
+        Args:
+            max_batch_size (int, optional): Flush as soon as this many items
+                                            are queued. Defaults to 16.
+            max_queue_time (float, optional): Flush after the first queued item
+                                              has waited this many seconds.
+                                              Defaults to 0.02.
+        """
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._queue = []
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def process(self, item):
+        """
+        Queue an item and wait for its result.
+
+        Args:
+            item: The request to process as part of a batch
+
+        Returns:
+            The result produced for this item by process_batch()
+
+        Raises:
+            Exception: Any exception raised while processing the item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((item, future))
+
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_queue_time, self._flush)
+
+        return await future
+
+    @abstractmethod
+    async def process_batch(self, items: list):
+        """
+        Process a batch of queued items.
+
+        Args:
+            items (list): The queued items, in submission order
+
+        Returns:
+            list: One result per item, in the same order. A result that is an
+                  exception instance is raised to the matching caller.
+        """
+
+    async def discard(self, result):
+        """
+        Release a result whose caller stopped waiting for it.
+
+        Override this when results hold resources, such as open streams.
+
+        Args:
+            result: The unclaimed result produced by process_batch()
+        """
+
+    def _flush(self):
+        """
+        Hand the current queue to process_batch() in a background task.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: list):
+        """
+        Run process_batch() and resolve each caller's future.
+
+        Args:
+            batch (list): Tuples of (item, future) taken from the queue
+        """
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        unclaimed = []
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # Caller was cancelled while waiting
+                if not isinstance(result, BaseException):
+                    unclaimed.append(result)
+            elif isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        for result in unclaimed:
+            await self.discard(result)
@@ -5,6 +5,7 @@ It is responsible for loading and providing access to the application's configur
 """
 import os
 import sys
+from functools import cached_property
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,9 +23,12 @@ class Config:
     Attributes:
         OPENAI_API_KEY (str): OpenAI API key for authentication
         MODEL_NAME (str): The OpenAI model to use for completions
+        MAX_CONTEXT_TOKENS (int): Token budget for the conversation sent to the model
         SYSTEM_PROMPT (str): The default system prompt for the agent
         FUZZY_SEARCH_THRESHOLD (int): Minimum score (0-100) for fuzzy search matches
         DEFAULT_SEARCH_RESULTS (int): Default number of results to return from searches
+        MAX_OUTPUT_BYTES (int): Per-stream limit on captured command output (0 for no limit)
+        JOURNAL_PATH (str): File to log conversation messages to (disabled if empty)
     """
     # API keys
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", None)
@@ -32,6 +36,7 @@ class Config:
     # Model settings
     DEFAULT_MODEL_NAME = "gpt-4o"
     MODEL_NAME = os.getenv("MODEL_NAME", "") or DEFAULT_MODEL_NAME
+    MAX_CONTEXT_TOKENS = int(os.getenv("MAX_CONTEXT_TOKENS", "8000"))
 
     # System prompt - Always set a default value if not provided or empty
     DEFAULT_SYSTEM_PROMPT = """You are an autonomous developer agent. Follow the user's goal using an explicit multi‑step plan. Each step must be atomic (one terminal command or one tool call)."""
@@ -41,6 +46,12 @@ class Config:
     FUZZY_SEARCH_THRESHOLD = int(os.getenv("FUZZY_SEARCH_THRESHOLD", "60"))
     DEFAULT_SEARCH_RESULTS = int(os.getenv("DEFAULT_SEARCH_RESULTS", "3"))
 
+    # Command settings
+    MAX_OUTPUT_BYTES = int(os.getenv("MAX_OUTPUT_BYTES", "1048576"))
+
+    # Persistence settings
+    JOURNAL_PATH = os.getenv("JOURNAL_PATH", "")
+
     def __init__(self):
         """
         Initialize the configuration and validate required variables.
@@ -115,7 +126,7 @@ class Config:
         return {k: v for k, v in os.environ.items()
                 if k.startswith("MERLIN_DIR_") and v}
 
-    @property
+    @cached_property
     def directories(self):
         """
         Gets configured directories from the .env file.
@@ -125,7 +136,7 @@ class Config:
         from a simplified name to the directory path.
 
         Only includes specifically configured directories plus the current
-        working directory.
+        working directory. The mapping is computed once and then cached.
 
         Returns:
             dict: A dictionary mapping directory aliases (lowercase names) to their absolute paths
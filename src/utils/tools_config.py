@@ -10,13 +10,15 @@ TOOLS = [
         "type": "function",
         "function": {
             "name": "execute_commands",
-            "description": "Run shell commands.",
+            "description": "Run shell commands. Set parallel to true only when "
+                           "the commands do not depend on each other.",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "commands": {"type": "array",
                                  "items": {"type": "string"}},
-                    "background": {"type": "boolean"}
+                    "background": {"type": "boolean"},
+                    "parallel": {"type": "boolean"}
                 },
                 "required": ["commands"]
             }